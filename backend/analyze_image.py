@@ -3,9 +3,19 @@ import numpy as np
 
 img = Image.open('page0.png')
 arr = np.array(img)
+if arr.ndim == 2:
+    # grayscale preview from render_page.py: treat it as a single channel
+    arr = arr[..., None]
 print('shape', arr.shape, 'dtype', arr.dtype)
 print('min/max', arr.min(), arr.max(), 'mean', arr.mean())
-print('unique colors', len(np.unique(arr.reshape(-1, arr.shape[2]), axis=0)))
-# detect if mostly white
-white_ratio = np.mean(np.all(arr > 240, axis=2))
+# pack each pixel's channels into one uint32 so unique runs on a flat 1-D array
+packed = np.zeros(arr.shape[:2], dtype=np.uint32)
+for ch in range(arr.shape[2]):
+    packed = (packed << 8) | arr[..., ch]
+print('unique colors', np.unique(packed).size)
+# detect if mostly white: AND per-channel uint8 compares, no 3-D temporary or axis reduce
+mask = arr[..., 0] > 240
+for ch in range(1, arr.shape[2]):
+    mask &= arr[..., ch] > 240
+white_ratio = float(mask.mean())
 print('white ratio', white_ratio)
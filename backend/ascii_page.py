@@ -5,6 +5,7 @@ img = Image.open('page0.png').convert('L')
 img = img.resize((80, 100))
 arr = np.array(img)
 chars = " .:-=+*#%@"
-for row in arr:
-    line = ''.join(chars[int(val/255*(len(chars)-1))] for val in row)
-    print(line)
+lut = np.frombuffer(chars.encode(), dtype='S1')
+idx = (arr.astype(np.uint16) * (len(chars) - 1) // 255).astype(np.intp)
+out = lut[idx]
+print(b"\n".join(row.tobytes() for row in out).decode())
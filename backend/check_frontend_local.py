@@ -1,7 +1,19 @@
 import urllib.request
-for url in ('http://localhost:5173/','http://[::1]:5173/'):
+from concurrent.futures import ThreadPoolExecutor
+
+URLS = ('http://localhost:5173/', 'http://[::1]:5173/')
+
+def fetch(url):
     try:
-        print('GET', url)
-        print(urllib.request.urlopen(url, timeout=5).read()[:200])
+        return urllib.request.urlopen(url, timeout=5).read()[:200]
     except Exception as e:
-        print('ERROR', url, e)
+        return e
+
+# The two URLs are different addresses, so there is no socket to share; check them concurrently
+with ThreadPoolExecutor(max_workers=len(URLS)) as pool:
+    for url, result in zip(URLS, pool.map(fetch, URLS)):
+        print('GET', url)
+        if isinstance(result, Exception):
+            print('ERROR', url, result)
+        else:
+            print(result)
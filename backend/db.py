@@ -1,73 +1,275 @@
+import atexit
+import queue
 import sqlite3
-import json
+import threading
+import time
 from pathlib import Path
+from typing import Optional
+
+import orjson
 
 DB_FILE = Path("database.db")
 
-def init_db():
-    """Initialise SQLite tables if they do not exist."""
-    conn = sqlite3.connect(DB_FILE)
-    c = conn.cursor()
-    
-    # Simple table for runs
-    c.execute('''
-        CREATE TABLE IF NOT EXISTS runs (
-            run_id TEXT PRIMARY KEY,
-            created_at TEXT,
-            data_json TEXT
-        )
-    ''')
-    
-    # Table for LLM audit logs
-    c.execute('''
-        CREATE TABLE IF NOT EXISTS llm_logs (
-            log_id INTEGER PRIMARY KEY AUTOINCREMENT,
-            run_id TEXT,
-            timestamp TEXT,
-            model TEXT,
-            prompt TEXT,
-            response_json TEXT,
-            error TEXT
-        )
-    ''')
-    
-    conn.commit()
-    conn.close()
+# One connection shared by every request thread; sqlite3 objects are not
+# thread-safe on their own, so all access goes through _LOCK.
+_CONN = None
+_LOCK = threading.Lock()
+
+# LLM audit rows are queued by callers and written by one background thread,
+# in one transaction per batch, so logging never blocks a request.
+_LOG_Q: "queue.Queue" = queue.Queue()
+_LOG_BATCH_SIZE = 50
+_LOG_BATCH_WAIT = 0.5  # seconds to wait for a batch to fill
+_LOG_STOP = object()
+_log_writer: Optional[threading.Thread] = None
+_log_writer_lock = threading.Lock()
+
+
+def _get_conn() -> sqlite3.Connection:
+    """Return the shared connection, opening it on first use. Caller must hold _LOCK."""
+    global _CONN
+    if _CONN is None:
+        _CONN = sqlite3.connect(DB_FILE, check_same_thread=False, isolation_level=None)
+        _CONN.execute("PRAGMA journal_mode=WAL")
+        _CONN.execute("PRAGMA synchronous=NORMAL")
+        _CONN.execute("PRAGMA temp_store=MEMORY")
+        _CONN.execute("PRAGMA mmap_size=268435456")
+    return _CONN
+
+
+def _write_log_batch(batch: list[tuple]):
+    with _LOCK:
+        conn = _get_conn()
+        conn.execute("BEGIN")
+        try:
+            conn.executemany('''
+                INSERT INTO llm_logs (run_id, timestamp, model, prompt, response_json, error)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', batch)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+
+def _log_writer_loop():
+    """Drain _LOG_Q in batches of up to _LOG_BATCH_SIZE rows or _LOG_BATCH_WAIT seconds."""
+    while True:
+        item = _LOG_Q.get()
+        batch, stop = [], item is _LOG_STOP
+        if not stop:
+            batch.append(item)
+        deadline = time.monotonic() + _LOG_BATCH_WAIT
+        while not stop and len(batch) < _LOG_BATCH_SIZE:
+            try:
+                item = _LOG_Q.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                break
+            if item is _LOG_STOP:
+                stop = True
+            else:
+                batch.append(item)
+        try:
+            if batch:
+                _write_log_batch(batch)
+        except Exception as e:
+            print(f"Failed to write LLM audit log batch: {e}")
+        finally:
+            for _ in range(len(batch) + stop):
+                _LOG_Q.task_done()
+        if stop:
+            return
+
+
+def _ensure_log_writer():
+    global _log_writer
+    if _log_writer is None:
+        with _log_writer_lock:
+            if _log_writer is None:
+                _log_writer = threading.Thread(target=_log_writer_loop, name="llm-log-writer", daemon=True)
+                _log_writer.start()
+
+
+def flush():
+    """Block until every queued LLM log row has been written."""
+    if _log_writer is not None:
+        _LOG_Q.join()
+
+
+def _close():
+    global _CONN, _log_writer
+    if _log_writer is not None:
+        _LOG_Q.put(_LOG_STOP)
+        _log_writer.join(timeout=5)
+        _log_writer = None
+    with _LOCK:
+        if _CONN is not None:
+            _CONN.close()
+            _CONN = None
+
+
+atexit.register(_close)
+
+# Summary columns kept on each runs row, filled from data_json on save, so the
+# runs listing reads plain columns instead of parsing every blob.
+_SUMMARY_COLUMNS = (
+    ("taxpayer_name", "TEXT", "$.taxpayer.name"),
+    ("pan", "TEXT", "$.taxpayer.pan"),
+    ("financial_year", "TEXT", "$.taxpayer.financial_year"),
+    ("status", "TEXT", "$.filing_status.status"),
+    ("net_refund", "REAL", "$.tax_computation.net_refund"),
+    ("net_payable", "REAL", "$.tax_computation.net_payable"),
+    ("total_income", "REAL", "$.aggregated_income.gross_total_income"),
+)
+_SUMMARY_NAMES = ", ".join(name for name, _, _ in _SUMMARY_COLUMNS)
+
+
+def init_db(llm_cache_ttl: float = 0):
+    """
+    Initialise SQLite tables if they do not exist, and drop llm_cache rows older
+    than llm_cache_ttl seconds (ttl <= 0 keeps them).
+    The database runs in WAL mode with synchronous=NORMAL, so commits skip the
+    per-transaction fsync; expect database.db-wal / database.db-shm sidecar
+    files next to database.db while the app is running.
+    """
+    with _LOCK:
+        c = _get_conn().cursor()
+        # journal_mode is persistent, but re-assert it for databases created before WAL
+        c.execute("PRAGMA journal_mode=WAL")
+        c.execute("PRAGMA synchronous=NORMAL")
+
+        # Simple table for runs
+        c.execute(f'''
+            CREATE TABLE IF NOT EXISTS runs (
+                run_id TEXT PRIMARY KEY,
+                created_at TEXT,
+                data_json TEXT CHECK (json_valid(data_json)),
+                {", ".join(f"{name} {sql_type}" for name, sql_type, _ in _SUMMARY_COLUMNS)}
+            )
+        ''')
+
+        # Databases created before the summary columns: add and backfill them
+        existing = {row[1] for row in c.execute("PRAGMA table_info(runs)")}
+        missing = [col for col in _SUMMARY_COLUMNS if col[0] not in existing]
+        for name, sql_type, _ in missing:
+            c.execute(f"ALTER TABLE runs ADD COLUMN {name} {sql_type}")
+        if missing:
+            c.execute("UPDATE runs SET " + ", ".join(
+                f"{name} = json_extract(data_json, '{path}')" for name, _, path in missing
+            ))
+
+        # Table for LLM audit logs
+        c.execute('''
+            CREATE TABLE IF NOT EXISTS llm_logs (
+                log_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                run_id TEXT,
+                timestamp TEXT,
+                model TEXT,
+                prompt TEXT,
+                response_json TEXT,
+                error TEXT
+            )
+        ''')
+
+        # Persistent LLM response cache, keyed by llm.LLMCache.make_key
+        c.execute('''
+            CREATE TABLE IF NOT EXISTS llm_cache (
+                cache_key TEXT PRIMARY KEY,
+                response TEXT,
+                created_at REAL
+            )
+        ''')
+
+        # Secondary indexes for the runs listing and per-run log lookups
+        c.execute('CREATE INDEX IF NOT EXISTS ix_runs_created ON runs(created_at DESC)')
+        c.execute('CREATE INDEX IF NOT EXISTS ix_llm_run_ts ON llm_logs(run_id, timestamp)')
+        c.execute('CREATE INDEX IF NOT EXISTS ix_llm_cache_created ON llm_cache(created_at)')
+
+        if llm_cache_ttl > 0:
+            c.execute('DELETE FROM llm_cache WHERE created_at < ?', (time.time() - llm_cache_ttl,))
+
+_SAVE_RUN_SQL = f'''
+    INSERT OR REPLACE INTO runs (run_id, created_at, data_json, {_SUMMARY_NAMES})
+    SELECT ?, ?, j, {", ".join(f"json_extract(j, '{path}')" for _, _, path in _SUMMARY_COLUMNS)}
+    FROM (SELECT json(?) AS j)
+'''
 
 def save_run(run_id: str, created_at: str, run_dict: dict):
-    conn = sqlite3.connect(DB_FILE)
-    c = conn.cursor()
-    c.execute('''
-        INSERT OR REPLACE INTO runs (run_id, created_at, data_json)
-        VALUES (?, ?, ?)
-    ''', (run_id, created_at, json.dumps(run_dict)))
-    conn.commit()
-    conn.close()
+    with _LOCK:
+        _get_conn().execute(_SAVE_RUN_SQL, (run_id, created_at, orjson.dumps(run_dict, option=orjson.OPT_NON_STR_KEYS).decode()))
+
+def load_run_json(run_id: str) -> Optional[str]:
+    """Return the stored JSON text of a run, for callers that validate it straight into a model."""
+    with _LOCK:
+        c = _get_conn().execute('SELECT data_json FROM runs WHERE run_id = ?', (run_id,))
+        row = c.fetchone()
+    return row[0] if row else None
 
 def load_run(run_id: str) -> dict:
-    conn = sqlite3.connect(DB_FILE)
-    c = conn.cursor()
-    c.execute('SELECT data_json FROM runs WHERE run_id = ?', (run_id,))
-    row = c.fetchone()
-    conn.close()
-    if row:
-        return json.loads(row[0])
+    data_json = load_run_json(run_id)
+    if data_json:
+        return orjson.loads(data_json)
     return None
 
-def load_all_runs() -> list[dict]:
-    conn = sqlite3.connect(DB_FILE)
-    c = conn.cursor()
-    c.execute('SELECT data_json FROM runs ORDER BY created_at DESC')
-    rows = c.fetchall()
-    conn.close()
-    return [json.loads(row[0]) for row in rows]
+def load_all_runs(limit: Optional[int] = None, offset: int = 0) -> list[dict]:
+    """Return runs newest first; pass limit/offset to page through large tables."""
+    # Aggregate the page into one JSON array in SQLite so Python parses once
+    with _LOCK:
+        c = _get_conn().execute('''
+            SELECT json_group_array(json(data_json)) FROM (
+                SELECT data_json FROM runs ORDER BY created_at DESC LIMIT ? OFFSET ?
+            )
+        ''', (-1 if limit is None else limit, offset))
+        row = c.fetchone()
+    return orjson.loads(row[0]) if row and row[0] else []
+
+def load_runs_summary(limit: Optional[int] = None, offset: int = 0) -> list[dict]:
+    """Return only the fields the runs list displays, from the summary columns."""
+    with _LOCK:
+        c = _get_conn().execute(f'''
+            SELECT run_id, created_at, {_SUMMARY_NAMES}
+            FROM runs ORDER BY created_at DESC LIMIT ? OFFSET ?
+        ''', (-1 if limit is None else limit, offset))
+        names = [d[0] for d in c.description]
+        rows = c.fetchall()
+    return [dict(zip(names, r)) for r in rows]
+
+def load_llm_response(cache_key: str, not_before: float = 0.0) -> Optional[tuple[str, float]]:
+    """Return (response text, created_at) cached under cache_key, if stored at or after not_before."""
+    with _LOCK:
+        row = _get_conn().execute(
+            'SELECT response, created_at FROM llm_cache WHERE cache_key = ? AND created_at >= ?',
+            (cache_key, not_before),
+        ).fetchone()
+    return (row[0], row[1]) if row else None
+
+def save_llm_response(cache_key: str, response: str):
+    with _LOCK:
+        _get_conn().execute(
+            'INSERT OR REPLACE INTO llm_cache (cache_key, response, created_at) VALUES (?, ?, ?)',
+            (cache_key, response, time.time()),
+        )
+
+def load_llm_responses(key_prefix: str, not_before: float = 0.0, limit: int = 256) -> list[str]:
+    """Return up to limit cached responses whose key starts with key_prefix, oldest first."""
+    with _LOCK:
+        rows = _get_conn().execute(
+            'SELECT response FROM llm_cache WHERE cache_key >= ? AND cache_key < ? AND created_at >= ? '
+            'ORDER BY created_at DESC LIMIT ?',
+            (key_prefix, key_prefix + '\uffff', not_before, limit),
+        ).fetchall()
+    return [row[0] for row in reversed(rows)]
+
+def purge_llm_cache(not_before: float) -> int:
+    """Delete cached LLM responses stored before not_before; returns how many were removed."""
+    with _LOCK:
+        return _get_conn().execute('DELETE FROM llm_cache WHERE created_at < ?', (not_before,)).rowcount
+
+def log_llm_calls(rows: list[tuple]):
+    """Queue many (run_id, timestamp, model, prompt, response, error) rows for the writer thread."""
+    _ensure_log_writer()
+    for row in rows:
+        _LOG_Q.put_nowait(row)
 
 def log_llm_call(run_id: str, timestamp: str, model: str, prompt: str, response: str, error: str = ""):
-    conn = sqlite3.connect(DB_FILE)
-    c = conn.cursor()
-    c.execute('''
-        INSERT INTO llm_logs (run_id, timestamp, model, prompt, response_json, error)
-        VALUES (?, ?, ?, ?, ?, ?)
-    ''', (run_id, timestamp, model, prompt, response, error))
-    conn.commit()
-    conn.close()
+    log_llm_calls([(run_id, timestamp, model, prompt, response, error)])
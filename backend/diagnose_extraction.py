@@ -38,7 +38,7 @@ if Path(form16_path).exists():
     
     print("\nEXTRACTED VALUES FROM FORM 16:")
     salary = _extract_salary_from_form16(text_form16)
-    tds = _extract_tds_from_form16(text_form16)
+    tds = _extract_tds_from_form16(text_form16, salary_to_avoid=salary)
     c80c = _extract_80c_from_form16(text_form16)
     c80d = _extract_80d_from_form16(text_form16)
     
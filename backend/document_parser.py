@@ -1,22 +1,44 @@
 """
 Document text extractor for ITR Auto-Filer.
-Supports PDF text extraction via PyPDF2, OCR via Tesseract or PaddleOCR,
+Supports PDF text extraction via PyMuPDF (PyPDF2 fallback), OCR via Tesseract or PaddleOCR,
 and PDF-to-image conversion for scanned documents.
 """
 
+import functools
 import os
 import re
+import subprocess
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import tempfile
 
 # Standard Tesseract install path on Windows (user has 5.5.0 here)
 TESSERACT_DEFAULT_WIN = r"C:\Program Files\Tesseract-OCR\tesseract.exe"
 
+# Pages are OCR'd by parallel Tesseract processes; keep each one single-threaded
+# so they don't oversubscribe the CPU with OpenMP threads. Only those subprocesses
+# get the limit: setting it in os.environ would also cap PaddleOCR in this process.
+_TESSERACT_OMP_THREAD_LIMIT = "1"
+# Seconds a Tesseract batch may take per page before it is killed and PaddleOCR is tried
+_TESSERACT_PAGE_TIMEOUT = 60
+_OCR_WORKERS = os.cpu_count() or 1
+
+# Scanned pages are rasterized for OCR at Tesseract's preferred ~300 DPI, but never
+# above the resolution of the embedded scan (upsampling only adds pixels to process).
+_OCR_TARGET_DPI = 300
+_OCR_MIN_DPI = 144  # the previous fixed 2x zoom
+
+# PyMuPDF is not thread-safe, even across separate Documents, and uploads are
+# extracted on several threads: every fitz call in this module runs under this lock.
+_FITZ_LOCK = threading.Lock()
+
 class OCRDependencyError(Exception):
     """Raised when the OCR engine or supporting tools are not available."""
 
 
+@functools.lru_cache(maxsize=1)
 def _get_tesseract_paths():
     """Return candidate paths for Tesseract executable (Windows and generic)."""
     candidates = []
@@ -28,11 +50,12 @@ def _get_tesseract_paths():
             os.path.expandvars(r"%ProgramFiles(x86)%\Tesseract-OCR\tesseract.exe"),
         ]
     candidates.append(None)  # PATH
-    return candidates
+    return tuple(candidates)
 
 
+@functools.lru_cache(maxsize=1)
 def _get_tesseract_cmd():
-    """Return first existing Tesseract path, or None to use PATH."""
+    """Return first existing Tesseract path, or None to use PATH. Cached: the install does not move at runtime."""
     for p in _get_tesseract_paths():
         if p is None:
             return None
@@ -107,6 +130,45 @@ def _ensure_ocr_available():
     )
 
 
+# Patterns used by _clean_ocr_text, compiled once at import.
+_LEAD_GARBAGE_RE = re.compile(r"^[\s\\/'\")(]{0,5}")
+# Both "\\'" fixups and the stray-backslash removal reduce to dropping every backslash
+_STRIP_BACKSLASH = str.maketrans({"\\": ""})
+# Space runs -> " " and 3+ line breaks -> paragraph break, in one scan
+_WHITESPACE_RE = re.compile(r"( {2,})|(\n\s*\n\s*\n+)")
+# Orphaned leading characters on each line, unless the line opens a bracketed marker
+_ORPHAN_PREFIX_RE = re.compile(r"^(?![\[\(\{][^\S\n]*[A-Z])[^\w\n]{0,2}(?=[A-Z0-9])", re.MULTILINE)
+_TAX_FIX_RULES = {
+    r"PAN\s+of\s+the\s+Employee\s*\|\s*e\s+by": "PAN of the Employee issued by",
+    r"\(1f\s+available": "(If available",
+    r"Lastupdated": "Last updated",
+    r"Governmentof": "Government of",
+    r"FORM\s+1S(?!\d)": "FORM NO. 16",
+    r"TRACES\s*-": "TRACES -",
+    r"Enablin\s+g\s+System": "Enabling System",
+    r"urce\s+on": "urce on",
+    r"Rs\s*\)\s*": "Rs. ",
+    r"91\)": "+91",
+    r"pod\s+Government": "pod\nGovernment",
+}
+_TAX_FIXES = [(re.compile(pattern, re.IGNORECASE), replacement) for pattern, replacement in _TAX_FIX_RULES.items()]
+# One alternation of every fixup: a single scan tells whether any of them can apply
+_ANY_TAX_FIX_RE = re.compile("|".join(f"(?:{pattern})" for pattern in _TAX_FIX_RULES), re.IGNORECASE)
+# Rs spacing, long dash runs and leftover double spaces, in one scan
+_FINAL_FIXES_RE = re.compile(r"(Rs\s+\.\s+)|(-{4,})|( {2,})")
+_FINAL_FIXES = ("", "Rs. ", "---", " ")  # replacement for each group of _FINAL_FIXES_RE
+
+
+def _normalize_whitespace(m: re.Match) -> str:
+    return " " if m.lastindex == 1 else "\n\n"
+
+
+def _final_fix(m: re.Match) -> str:
+    group = m.lastindex
+    assert group is not None  # every alternative of _FINAL_FIXES_RE is a capturing group
+    return _FINAL_FIXES[group]
+
+
 def _clean_ocr_text(text: str) -> str:
     """
     Clean and normalize OCR-extracted text by removing artifacts,
@@ -117,83 +179,64 @@ def _clean_ocr_text(text: str) -> str:
     
     # 1. Fix leading garbage characters (but preserve document structure)
     # Remove only if at the very start before meaningful content
-    text = re.sub(r"^[\s\\/'\")(]{0,5}", "", text)
-    
-    # 2. Fix common OCR character substitutions (be careful not to over-correct)
-    replacements = {
-        r"\\\'": "'",          # \' -> '
-        r"\\'": "'",           # \' -> '
-        r"\\": "",             # Remove stray backslashes (but not double backslash at end)
-    }
-    for pattern, replacement in replacements.items():
-        text = re.sub(pattern, replacement, text)
+    text = _LEAD_GARBAGE_RE.sub("", text)
     
-    # 3. Fix spacing issues - normalize multiple spaces but keep structure
-    text = re.sub(r"  +", " ", text)
+    # 2. Fix common OCR character substitutions (stray backslashes)
+    text = text.translate(_STRIP_BACKSLASH)
     
-    # 4. Fix line breaks - normalize multiple newlines while preserving paragraphs
-    text = re.sub(r"\n\s*\n\s*\n+", "\n\n", text)
+    # 3-4. Normalize multiple spaces and collapse runs of blank lines,
+    # keeping structure and paragraph breaks
+    text = _WHITESPACE_RE.sub(_normalize_whitespace, text)
     
     # 5. Fix broken lines (words split across lines with no clear reason)
-    # This regex recombines lines that end in lowercase and start in lowercase
-    lines = text.split("\n")
+    # Recombine lines that end in lowercase with a next line starting in lowercase
+    lines = [line.rstrip() for line in text.split("\n")]
+    n = len(lines)
     fixed_lines = []
+    append = fixed_lines.append
     i = 0
-    while i < len(lines):
-        line = lines[i].rstrip()
-        # Check if this line ends with lowercase and next line starts with lowercase
-        # (likely a word break from OCR)
-        if (i < len(lines) - 1 and 
-            line and 
-            line[-1].islower() and 
-            lines[i + 1] and 
-            lines[i + 1][0].islower() and
-            len(line) < 80):  # Only recombine short lines (not full paragraphs)
-            line = line + lines[i + 1].strip()
+    while i < n:
+        line = lines[i]
+        # Only recombine short lines (not full paragraphs); empty slices are never lower
+        if i + 1 < n and len(line) < 80 and line[-1:].islower() and lines[i + 1][:1].islower():
+            line += lines[i + 1]
             i += 2
         else:
             i += 1
-        
-        # Clean orphaned characters but preserve document markers
-        if line and not re.match(r"^[\[\(\{]\s*[A-Z]", line):
-            line = re.sub(r"^[\s\W]{0,2}(?=[A-Z0-9])", "", line)
-        
-        line = line.rstrip()
         if line:
-            fixed_lines.append(line)
+            append(line)
     
-    text = "\n".join(fixed_lines)
+    # Clean orphaned characters but preserve document markers, for all lines at once
+    text = _ORPHAN_PREFIX_RE.sub("", "\n".join(fixed_lines))
     
-    # 6. Fix common tax document OCR errors
-    replacements_tax = {
-        r"PAN\s+of\s+the\s+Employee\s*\|\s*e\s+by": "PAN of the Employee issued by",
-        r"\(1f\s+available": "(If available",
-        r"Lastupdated": "Last updated",
-        r"Governmentof": "Government of",
-        r"FORM\s+1S(?!\d)": "FORM NO. 16",
-        r"TRACES\s*-": "TRACES -",
-        r"Enablin\s+g\s+System": "Enabling System",
-        r"urce\s+on": "urce on",
-        r"Rs\s*\)\s*": "Rs. ",
-        r"91\)": "+91",
-        r"pod\s+Government": "pod\nGovernment",
-        r"(\d{2})-(\d{2})-(\d{4})": r"\1-\2-\3",  # Date format fix
-    }
-    for pattern, replacement in replacements_tax.items():
-        text = re.sub(pattern, replacement, text, flags=re.IGNORECASE)
+    # 6. Fix common tax document OCR errors (applied in order; skipped when none match)
+    if _ANY_TAX_FIX_RE.search(text):
+        for pattern, replacement in _TAX_FIXES:
+            text = pattern.sub(replacement, text)
     
-    # 7. Fix monetary formatting
-    text = re.sub(r"Rs\s+\.\s+", "Rs. ", text)
-    
-    # 8. Remove excessive dashes but keep meaningful separators
-    text = re.sub(r"-{4,}", "---", text)
-    
-    # 9. Final cleanup - remove any double spaces left over
-    text = re.sub(r"  +", " ", text)
+    # 7-9. Fix monetary formatting, trim excessive dashes (keeping meaningful
+    # separators) and remove any double spaces left over
+    text = _FINAL_FIXES_RE.sub(_final_fix, text)
     
     return text.strip()
 
 
+# Strong document markers, matched together as one alternation
+# (\s is narrowed to exclude newlines so a marker can never span two lines)
+_DOC_MARKERS = [
+    r"FORM\s+(?:NO\.?\s+)?16",
+    r"AXES\s+BANK",
+    r"BANK\s+INTEREST",
+    r"FORM\s+26AS",
+    r"26AS",
+    r"TDS\s+COMPLIANCE",
+]
+_DOC_MARKER_RE = re.compile(
+    "|".join(f"(?:{marker})" for marker in _DOC_MARKERS).replace(r"\s", r"[^\S\n]"),
+    re.IGNORECASE,
+)
+
+
 def _detect_multiple_documents(text: str) -> list:
     """
     Detect if multiple documents (Form 16, Bank statements, etc) 
@@ -203,70 +246,60 @@ def _detect_multiple_documents(text: str) -> list:
     if not text:
         return [text]
     
-    # Split on strong document markers
-    doc_markers = [
-        r"FORM\s+(?:NO\.?\s+)?16",
-        r"AXES\s+BANK",
-        r"BANK\s+INTEREST",
-        r"FORM\s+26AS",
-        r"26AS",
-        r"TDS\s+COMPLIANCE",
-    ]
+    # One scan over the whole text; every line holding a marker (other than
+    # the first line) starts a new document
+    starts = []
+    for m in _DOC_MARKER_RE.finditer(text):
+        line_start = text.rfind("\n", 0, m.start()) + 1
+        if line_start and (not starts or starts[-1] != line_start):
+            starts.append(line_start)
     
-    documents = []
-    current_doc = []
-    lines = text.split("\n")
-    
-    for i, line in enumerate(lines):
-        # Check if this line is a document header
-        is_header = any(re.search(marker, line, re.IGNORECASE) for marker in doc_markers)
-        
-        if is_header and current_doc:
-            # Start of new document - save previous one
-            documents.append("\n".join(current_doc))
-            current_doc = [line]
-        else:
-            current_doc.append(line)
-    
-    if current_doc:
-        documents.append("\n".join(current_doc))
-    
-    return [d.strip() for d in documents if d.strip()]
+    bounds = [0, *starts, len(text)]
+    documents = (text[a:b].strip() for a, b in zip(bounds, bounds[1:]))
+    return [d for d in documents if d]
 
 
 def extract_text_from_file(file_path: str, content_type: str = "") -> str:
     """
     Extract raw text from a PDF or image file.
-    Handles text-based PDFs (PyPDF2), scanned PDFs (Tesseract or PaddleOCR),
+    Handles text-based PDFs (PyMuPDF, falling back to PyPDF2), scanned PDFs (Tesseract or PaddleOCR),
     and images (Tesseract). If a scanned PDF is uploaded and no OCR is available,
     returns placeholder text so the filing flow can continue (with a disclaimer).
     """
     ext = Path(file_path).suffix.lower()
     filename = Path(file_path).name.lower()
     
-    # Try PyPDF2 for text-based PDF files
+    # Text-based PDF files: PyMuPDF's text layer first, PyPDF2 only if PyMuPDF fails
     if ext == ".pdf" or "pdf" in content_type.lower():
+        text = ""
         try:
-            import PyPDF2
-            text = ""
-            with open(file_path, "rb") as f:
-                reader = PyPDF2.PdfReader(f)
-                for page in reader.pages:
-                    extracted = page.extract_text()
-                    if extracted:
-                        text += extracted + "\n"
-            
-            # Success: Text-based PDF with content
-            if text.strip():
-                # Clean the extracted text
-                text = _clean_ocr_text(text)
-                print(f"[PDF EXTRACTION] Text-based PDF extracted {len(text)} chars from {filename}")
-                return text
-            
-            # Failure: PDF is scanned/image-based (no text layer)
-            print(f"[PDF EXTRACTION] ⚠ PDF is scanned/image-based - no text layer in {filename}. Attempting OCR...")
+            import fitz  # PyMuPDF
+            with _FITZ_LOCK, fitz.open(file_path) as pdf_doc:
+                text = "\n".join(page.get_text() for page in pdf_doc)
         except Exception as e:
-            print(f"[PDF EXTRACTION] PyPDF2 failed: {e}")
+            print(f"[PDF EXTRACTION] PyMuPDF failed: {e}. Trying PyPDF2...")
+            try:
+                import PyPDF2
+                with open(file_path, "rb") as f:
+                    reader = PyPDF2.PdfReader(f)
+                    parts = []
+                    for page in reader.pages:
+                        extracted = page.extract_text()
+                        if extracted:
+                            parts.append(extracted)
+                text = "\n".join(parts)
+            except Exception as e:
+                print(f"[PDF EXTRACTION] PyPDF2 failed: {e}")
+        
+        # Success: Text-based PDF with content
+        if text.strip():
+            # Clean the extracted text
+            text = _clean_ocr_text(text)
+            print(f"[PDF EXTRACTION] Text-based PDF extracted {len(text)} chars from {filename}")
+            return text
+        
+        # Failure: PDF is scanned/image-based (no text layer)
+        print(f"[PDF EXTRACTION] ⚠ PDF is scanned/image-based - no text layer in {filename}. Attempting OCR...")
         
         # PDF has no text layer - it's scanned. Try OCR.
         try:
@@ -319,10 +352,54 @@ def extract_text_from_file(file_path: str, content_type: str = "") -> str:
     )
 
 
+def _ocr_render_dpi(page) -> int:
+    """Pick the raster DPI for OCR from the page's largest embedded image."""
+    native_dpi = 0.0
+    try:
+        for info in page.get_image_info():
+            x0, _, x1, _ = info["bbox"]
+            if x1 - x0 > 0:
+                native_dpi = max(native_dpi, info["width"] / ((x1 - x0) / 72.0))
+    except Exception:
+        pass
+    if native_dpi <= 0:
+        return _OCR_TARGET_DPI
+    return int(max(_OCR_MIN_DPI, min(_OCR_TARGET_DPI, native_dpi)))
+
+
+# The shared PaddleOCR instance is not thread-safe, and uploads are extracted on
+# several threads: hold this lock to create it and for every ocr() call.
+_PADDLE_LOCK = threading.Lock()
+
+
+@functools.lru_cache(maxsize=1)
+def _get_paddle_ocr():
+    """Load the PaddleOCR models once and reuse them for every scanned PDF. Call with _PADDLE_LOCK held."""
+    from paddleocr import PaddleOCR
+    return PaddleOCR(lang='en', use_angle_cls=True, show_log=False)
+
+
+def _tesseract_batch(image_paths: list) -> str:
+    """
+    OCR several page images with one Tesseract invocation by passing it a list file.
+    Tesseract separates the pages in its output with form feeds.
+    Runs the binary directly rather than through pytesseract, which always passes
+    os.environ, so the OpenMP limit applies to this process alone.
+    """
+    list_path = os.path.join(os.path.dirname(image_paths[0]), f"batch_{Path(image_paths[0]).stem}.txt")
+    with open(list_path, "w", encoding="utf-8") as f:
+        f.write("\n".join(image_paths) + "\n")
+    env = dict(os.environ, OMP_THREAD_LIMIT=os.environ.get("OMP_THREAD_LIMIT", _TESSERACT_OMP_THREAD_LIMIT))
+    result = subprocess.run([_get_tesseract_cmd() or "tesseract", list_path, "stdout"],
+                            capture_output=True, check=True, env=env,
+                            timeout=_TESSERACT_PAGE_TIMEOUT * len(image_paths))
+    return result.stdout.decode("utf-8", errors="replace")
+
+
 def _extract_text_from_pdf_via_ocr(pdf_path: str) -> str:
     """
     Convert PDF to images and extract text via OCR (Tesseract or PaddleOCR).
-    Used for scanned/image-based PDFs where PyPDF2 fails.
+    Used for scanned/image-based PDFs that have no text layer.
     """
     print(f"[OCR] Extracting from scanned PDF: {pdf_path}")
     
@@ -333,26 +410,33 @@ def _extract_text_from_pdf_via_ocr(pdf_path: str) -> str:
             raise OCRDependencyError(
                 "Scanned PDFs need PyMuPDF to convert pages to images. Run: pip install pymupdf"
             )
-        from PIL import Image
-        import io
-        
         ocr_type = _ensure_ocr_available()
-        pdf_doc = fitz.open(pdf_path)
-        full_text = ""
+        with _FITZ_LOCK:
+            pdf_doc = fitz.open(pdf_path)
+            page_count = len(pdf_doc)
         try:
             if ocr_type == "tesseract":
                 try:
-                    import pytesseract
-                    cmd = _get_tesseract_cmd()
-                    if cmd:
-                        pytesseract.tesseract_cmd = cmd
-                    print("[OCR] Using Tesseract OCR at", pytesseract.tesseract_cmd or "PATH")
-                    for page_num, page in enumerate(pdf_doc):
-                        print(f"[OCR] Tesseract Page {page_num + 1}/{len(pdf_doc)}...")
-                        pix = page.get_pixmap(matrix=fitz.Matrix(2, 2))
-                        img_data = pix.tobytes("ppm")
-                        img = Image.open(io.BytesIO(img_data))
-                        full_text += pytesseract.image_to_string(img) + "\n"
+                    parts = []
+                    with tempfile.TemporaryDirectory() as tmpdir:
+                        page_paths = []
+                        # Render every page under the lock; the Tesseract processes then run without it
+                        with _FITZ_LOCK:
+                            for page_num, page in enumerate(pdf_doc):
+                                print(f"[OCR] Tesseract Page {page_num + 1}/{page_count}...")
+                                # Grayscale: Tesseract binarizes anyway, and it is a third of the bytes
+                                pix = page.get_pixmap(dpi=_ocr_render_dpi(page), colorspace=fitz.csGRAY)
+                                page_path = os.path.join(tmpdir, f"p{page_num}.pgm")
+                                pix.save(page_path)
+                                page_paths.append(page_path)
+                            page = pix = None  # free the last page's objects while still locked
+                        # Split pages into one contiguous batch per worker; each batch is a
+                        # single Tesseract process, so the model loads once per batch.
+                        batch_size = -(-len(page_paths) // _OCR_WORKERS) or 1
+                        batches = [page_paths[i:i + batch_size] for i in range(0, len(page_paths), batch_size)]
+                        with ThreadPoolExecutor(max_workers=max(1, len(batches))) as pool:
+                            parts.extend(pool.map(_tesseract_batch, batches))
+                    full_text = "\n".join(parts)
                     if full_text.strip():
                         # Clean OCR output
                         full_text = _clean_ocr_text(full_text)
@@ -362,24 +446,34 @@ def _extract_text_from_pdf_via_ocr(pdf_path: str) -> str:
                     print(f"[OCR] Tesseract failed: {e}")
             # Try PaddleOCR if Tesseract failed or was not chosen
             try:
-                from paddleocr import PaddleOCR
+                import numpy as np
+                with _PADDLE_LOCK:
+                    ocr = _get_paddle_ocr()
                 print("[OCR] Using PaddleOCR")
-                ocr = PaddleOCR(lang='en', use_angle_cls=True, show_log=False)
-                with tempfile.TemporaryDirectory() as tmpdir:
-                    for page_num, page in enumerate(pdf_doc):
-                        print(f"[OCR] PaddleOCR Page {page_num + 1}/{len(pdf_doc)}...")
-                        pix = page.get_pixmap(matrix=fitz.Matrix(2, 2))
-                        temp_path = os.path.join(tmpdir, f"p{page_num}.png")
-                        pix.save(temp_path)
-                        result = ocr.ocr(temp_path)
-                        if result and result[0]:
-                            for line in result[0]:
-                                if line and len(line) >= 2:
-                                    part = line[1]
-                                    if isinstance(part, (list, tuple)):
-                                        part = part[0] if part else ""
-                                    if part and str(part).strip():
-                                        full_text += str(part).strip() + "\n"
+                parts = []
+                for page_num in range(page_count):
+                    print(f"[OCR] PaddleOCR Page {page_num + 1}/{page_count}...")
+                    # Only the render holds the fitz lock; the copy in img outlives the pixmap
+                    with _FITZ_LOCK:
+                        page = pdf_doc[page_num]
+                        pix = page.get_pixmap(dpi=_ocr_render_dpi(page), alpha=False)
+                        # Hand PaddleOCR the raw samples instead of a PNG encode/decode round trip;
+                        # it expects a contiguous, cv2-style BGR array (the channel flip is a negative-stride view).
+                        img = np.ascontiguousarray(
+                            np.frombuffer(pix.samples, dtype=np.uint8).reshape(pix.height, pix.width, pix.n)[:, :, ::-1]
+                        )
+                        del page, pix
+                    with _PADDLE_LOCK:
+                        result = ocr.ocr(img)
+                    if result and result[0]:
+                        for line in result[0]:
+                            if line and len(line) >= 2:
+                                part = line[1]
+                                if isinstance(part, (list, tuple)):
+                                    part = part[0] if part else ""
+                                if part and str(part).strip():
+                                    parts.append(str(part).strip())
+                full_text = "\n".join(parts)
                 if full_text.strip():
                     # Clean OCR output
                     full_text = _clean_ocr_text(full_text)
@@ -393,7 +487,8 @@ def _extract_text_from_pdf_via_ocr(pdf_path: str) -> str:
                 "OCR did not extract any text. Install Tesseract or paddleocr for better results."
             )
         finally:
-            pdf_doc.close()
+            with _FITZ_LOCK:
+                pdf_doc.close()
     except OCRDependencyError:
         raise
     except Exception as e:
@@ -401,17 +496,7 @@ def _extract_text_from_pdf_via_ocr(pdf_path: str) -> str:
         raise OCRDependencyError(f"OCR failed: {e}")
 
 
-def _generate_mock_text(filename: str) -> str:
-    """
-    Generate realistic mock text for demo purposes.
-    Matches the user's uploaded documents (Axis Bank, TRACES Form 16) 
-    to ensure the dashboard shows non-zero values during demo.
-    """
-    fn = filename.lower()
-    
-    # 1. Form 16 / Salary
-    if any(k in fn for k in ["form16", "form_16", "16", "salary", "traces"]):
-        return """
+_MOCK_FORM16_TEXT = """
         FORM NO. 16 - Certificate under Section 203 of the Income-tax Act, 1961
         Employer: TechCorp India Pvt Ltd (TAN: MUMB12345A)
         Employee: Rahul Sharma (PAN: ABCRS1234H)
@@ -424,10 +509,8 @@ def _generate_mock_text(filename: str) -> str:
         - Section 80D (Health): Rs. 25,000
         - Total TDS from Salary: Rs. 65,000
         """
-        
-    # 2. Bank / Interest / Home Loan
-    elif any(k in fn for k in ["bank", "interest", "fd", "loan", "axis", "statement"]):
-        return """
+
+_MOCK_BANK_TEXT = """
         INTEREST CERTIFICATE & LOAN STATEMENT
         Axis Bank Ltd - FY 2024-25
         Customer: Rahul Sharma
@@ -437,16 +520,34 @@ def _generate_mock_text(filename: str) -> str:
         TDS Deducted on Interest @ 10%: Rs. 20,000
         Net Interest Credited: Rs. 1,80,000
         """
-        
-    # 3. Form 26AS
-    elif "26as" in fn:
-        return """
+
+_MOCK_26AS_TEXT = """
         FORM 26AS - Annual Tax Statement
         PAN: ABCRS1234H | AY: 2025-26
         
         - TDS on Salary (TAN: MUMB12345A): 65,000
         - TDS on Interest (TAN: SBIN00001A): 20,000
         """
+
+# Filename keyword table for _generate_mock_text, checked in priority order
+# (e.g. "bank_2016.pdf" is a Form 16 because that category is checked first).
+_MOCK_DISPATCH = [
+    (re.compile(r"form16|form_16|16|salary|traces"), _MOCK_FORM16_TEXT),     # 1. Form 16 / Salary
+    (re.compile(r"bank|interest|fd|loan|axis|statement"), _MOCK_BANK_TEXT),  # 2. Bank / Interest / Home Loan
+    (re.compile(r"26as"), _MOCK_26AS_TEXT),                                  # 3. Form 26AS
+]
+
+
+def _generate_mock_text(filename: str) -> str:
+    """
+    Generate realistic mock text for demo purposes.
+    Matches the user's uploaded documents (Axis Bank, TRACES Form 16) 
+    to ensure the dashboard shows non-zero values during demo.
+    """
+    fn = filename.lower()
+    for keywords, mock_text in _MOCK_DISPATCH:
+        if keywords.search(fn):
+            return mock_text
         
     # Default fallback
     return f"Extracted Content for {filename}: No specific mock found. Please use standard demo filenames."
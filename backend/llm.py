@@ -1,22 +1,174 @@
 import os
 import json
 import uuid
+import asyncio
+import hashlib
+import functools
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import Optional, Type, TypeVar
-from pydantic import BaseModel
+import aiofiles
+from pydantic import BaseModel, TypeAdapter, create_model
 from dotenv import load_dotenv
 
-from db import log_llm_call
+from db import log_llm_call, load_llm_response, save_llm_response, purge_llm_cache
+
+# Resolved once at import instead of on every call; without the SDK the configs
+# below raise ImportError, which the calls catch into their existing fallbacks
+try:
+    from google.genai.types import GenerateContentConfig, Part
+except ImportError:
+    GenerateContentConfig = None
+    Part = None
 
 load_dotenv()
 
 T = TypeVar('T', bound=BaseModel)
 
+# Only near-deterministic calls are cached; higher temperatures are meant to vary
+CACHEABLE_MAX_TEMPERATURE = 0.1
+
+
+@functools.lru_cache(maxsize=64)
+def _json_config(schema, temperature: float):
+    """
+    GenerateContentConfig for a JSON response schema, built once per (schema, temperature).
+    With response_schema set, Gemini constrains decoding to the schema: the reply is
+    always a bare JSON value of that shape, never prose or a fenced code block.
+    """
+    if GenerateContentConfig is None:
+        raise ImportError("google.genai is not installed")
+    return GenerateContentConfig(
+        response_mime_type="application/json",
+        response_schema=schema,
+        temperature=temperature,
+    )
+
+
+@functools.lru_cache(maxsize=64)
+def _schema_cache_name(schema) -> str:
+    """Schema name plus a fingerprint of its JSON schema, so changing a model invalidates its cache entries."""
+    digest = hashlib.sha256(json.dumps(schema.model_json_schema(), sort_keys=True).encode("utf-8"))
+    return f"{schema.__name__}:{digest.hexdigest()[:16]}"
+
+
+@functools.lru_cache(maxsize=64)
+def _all_fields_default(schema) -> bool:
+    """True if every field of the schema has a default, i.e. schema() can build an instance."""
+    return not any(field.is_required() for field in schema.model_fields.values())
+
+
+@functools.lru_cache(maxsize=64)
+def _list_adapter(schema) -> TypeAdapter:
+    """TypeAdapter for a JSON array of `schema`; building one walks the whole model, so share it."""
+    return TypeAdapter(list[schema])
+
+
+@functools.lru_cache(maxsize=64)
+def _multi_task_schema(schemas: tuple) -> Type[BaseModel]:
+    """One model with a required task1..taskN field per schema, for generate_batch replies."""
+    return create_model(
+        "MultiTaskOutput",
+        **{f"task{n}": (schema, ...) for n, schema in enumerate(schemas, 1)},
+    )
+
+
+@functools.lru_cache(maxsize=16)
+def _text_config(temperature: float):
+    if GenerateContentConfig is None:
+        raise ImportError("google.genai is not installed")
+    return GenerateContentConfig(temperature=temperature)
+
+
+class LLMCache:
+    """
+    Exact-match LRU cache of raw LLM response text, keyed by a SHA-256 of the request.
+    With persist=True, entries are also written through to the llm_cache table, so
+    identical requests are answered from the database across restarts.
+    Entries older than ttl seconds are misses (ttl <= 0 keeps them until evicted); expired
+    rows are deleted from llm_cache on the first write and then at most once per ttl.
+    """
+
+    def __init__(self, max_entries: int = 512, persist: bool = False, ttl: float = 0):
+        self.max_entries = max_entries
+        self.persist = persist
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, tuple[str, float]]" = OrderedDict()  # key -> (value, stored at)
+        self._lock = threading.Lock()
+        self._next_purge = 0.0
+
+    @staticmethod
+    def make_key(model: str, prompt: str, schema_name: str, temperature: float, seed: str = "") -> str:
+        """`seed` partitions the cache, e.g. by financial year, so one partition can go stale alone."""
+        payload = json.dumps(
+            {"model": model, "prompt": prompt, "schema": schema_name, "temp": temperature, "seed": seed},
+            sort_keys=True,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _remember(self, key: str, value: str, stored_at: float):
+        with self._lock:
+            self._entries[key] = (value, stored_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get(self, key: str) -> Optional[str]:
+        # Oldest store time still fresh; 0 accepts every entry
+        fresh_since = time.time() - self.ttl if self.ttl > 0 else 0.0
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[1] >= fresh_since:
+                    self._entries.move_to_end(key)
+                    return entry[0]
+                del self._entries[key]
+        if not self.persist or self.max_entries <= 0:
+            return None
+        try:
+            row = load_llm_response(key, fresh_since)
+        except Exception as e:
+            print(f"Failed to read LLM cache: {e}")
+            return None
+        if row is None:
+            return None
+        value, stored_at = row
+        self._remember(key, value, stored_at)
+        return value
+
+    def set(self, key: str, value: str):
+        if self.max_entries <= 0:
+            return
+        now = time.time()
+        self._remember(key, value, now)
+        if self.persist:
+            try:
+                save_llm_response(key, value)
+                if self.ttl > 0 and now >= self._next_purge:
+                    self._next_purge = now + self.ttl
+                    purge_llm_cache(now - self.ttl)
+            except Exception as e:
+                print(f"Failed to write LLM cache: {e}")
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
 class LLMService:
     def __init__(self):
         self.api_key = os.getenv("GEMINI_API_KEY")
         self.is_configured = bool(self.api_key)
         self.use_demo_mode = os.getenv("LLM_DEMO_MODE", "false").lower() == "true"
+        self.cache = LLMCache(
+            int(os.getenv("LLM_CACHE_SIZE", "512")),
+            persist=os.getenv("LLM_CACHE_PERSIST", "true").lower() == "true",
+            ttl=float(os.getenv("LLM_CACHE_TTL", "3600")),
+        )
+        self.max_concurrent = int(os.getenv("LLM_MAX_CONCURRENT", "8"))
         
         if self.is_configured:
             # Try different GenAI SDK import paths and initialize client if possible.
@@ -81,45 +233,38 @@ class LLMService:
 
     def _generate_demo_json(self, schema: Type[T]) -> T:
         """Generate realistic demo data matching the schema (for testing without API key)"""
+        if not _all_fields_default(schema):
+            # schema() would only raise a ValidationError to be caught below
+            return None
         try:
             # Create a reasonable instance with default values
             return schema()
         except:
             return None
 
-    def generate_json(self, prompt: str, schema: Type[T]) -> Optional[T]:
+    def generate_json(self, prompt: str, schema: Type[T], cache_seed: str = "") -> Optional[T]:
         """Generate structured JSON matching the provided Pydantic schema"""
         
         if self.is_configured:
+            cache_key = self.cache.make_key(self.model_name, prompt, _schema_cache_name(schema), 0.1, cache_seed)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                try:
+                    return schema.model_validate_json(cached)
+                except Exception:
+                    pass
+            
             # Use real API
             try:
-                from google.genai.types import GenerateContentConfig
                 response = self.client.generate_content(
                     prompt,
-                    generation_config=GenerateContentConfig(
-                        response_mime_type="application/json",
-                        response_schema=schema,
-                        temperature=0.1,
-                    ),
+                    generation_config=_json_config(schema, 0.1),
                 )
                 
                 if response.text:
-                    try:
-                        result = schema.model_validate_json(response.text)
-                        self._safe_log(prompt, response.text, "")
+                    result = self._parse_json_response(prompt, response.text, schema, cache_key)
+                    if result is not None:
                         return result
-                    except Exception as parse_error:
-                        print(f"JSON parse error: {parse_error}")
-                        self._safe_log(prompt, response.text, str(parse_error))
-                        # Try to extract valid JSON from response
-                        try:
-                            import re
-                            json_match = re.search(r'\{.*\}', response.text, re.DOTALL)
-                            if json_match:
-                                result = schema.model_validate_json(json_match.group())
-                                return result
-                        except:
-                            pass
             except Exception as e:
                 print(f"[LLM] API error (using fallback): {e}")
                 self._safe_log(prompt, "", str(e))
@@ -128,30 +273,169 @@ class LLMService:
         # This ensures the system works even without API key
         return self._generate_demo_json(schema)
 
+    def generate_json_batch(self, prompts: list[str], schema: Type[T]) -> list[Optional[T]]:
+        """
+        generate_json for several prompts in one request: the uncached prompts are sent as
+        DOC_1..DOC_N and the model returns a JSON array with one object per document, in order.
+        If the batch reply is unusable, each prompt falls back to its own generate_json call,
+        run concurrently (at most LLM_MAX_CONCURRENT at a time).
+        """
+        if len(prompts) <= 1 or not self.is_configured:
+            return [self.generate_json(p, schema) for p in prompts]
+        
+        keys = [self.cache.make_key(self.model_name, p, _schema_cache_name(schema), 0.1) for p in prompts]
+        results: list[Optional[T]] = [None] * len(prompts)
+        pending = []
+        for i, key in enumerate(keys):
+            cached = self.cache.get(key)
+            if cached is not None:
+                try:
+                    results[i] = schema.model_validate_json(cached)
+                    continue
+                except Exception:
+                    pass
+            pending.append(i)
+        
+        items = None
+        if len(pending) > 1:
+            batch_prompt = (
+                f"The following {len(pending)} documents (DOC_1..DOC_{len(pending)}) are independent "
+                "requests. Answer each one and return a JSON array with exactly one result object "
+                "per document, in the same order.\n\n"
+                + "\n\n".join(f"=== DOC_{n} ===\n{prompts[i]}" for n, i in enumerate(pending, 1))
+            )
+            try:
+                response = self.client.generate_content(
+                    batch_prompt,
+                    generation_config=_json_config(list[schema], 0.1),
+                )
+                if response.text:
+                    items = _list_adapter(schema).validate_json(response.text)
+                    if len(items) != len(pending):
+                        raise ValueError(f"expected {len(pending)} results, got {len(items)}")
+                    self._safe_log(batch_prompt, response.text, "")
+            except Exception as e:
+                print(f"[LLM] Batch error (falling back to per-document calls): {e}")
+                self._safe_log(batch_prompt, "", str(e))
+                items = None
+        
+        if items is not None:
+            for n, i in enumerate(pending):
+                results[i] = items[n]
+                self.cache.set(keys[i], items[n].model_dump_json())
+        elif pending:
+            # Per-prompt fallback, at most max_concurrent requests in flight
+            with ThreadPoolExecutor(max_workers=max(1, min(self.max_concurrent, len(pending)))) as pool:
+                fallback = pool.map(lambda i: self.generate_json(prompts[i], schema), pending)
+                for i, result in zip(pending, fallback):
+                    results[i] = result
+        return results
+
+    def generate_batch(self, tasks: list[tuple[str, Type[BaseModel]]], cache_seed: str = "") -> list[Optional[BaseModel]]:
+        """
+        generate_json for several (prompt, schema) tasks in one request: the uncached tasks are
+        sent as TASK 1..TASK N and the model returns one JSON object with a task1..taskN key per
+        task, each matching that task's schema. Results come back in task order. If the reply is
+        unusable, each task falls back to its own generate_json call, run concurrently.
+        """
+        if len(tasks) <= 1 or not self.is_configured:
+            return [self.generate_json(p, schema, cache_seed) for p, schema in tasks]
+
+        keys = [self.cache.make_key(self.model_name, p, _schema_cache_name(schema), 0.1, cache_seed) for p, schema in tasks]
+        results: list[Optional[BaseModel]] = [None] * len(tasks)
+        pending = []
+        for i, ((_, schema), key) in enumerate(zip(tasks, keys)):
+            cached = self.cache.get(key)
+            if cached is not None:
+                try:
+                    results[i] = schema.model_validate_json(cached)
+                    continue
+                except Exception:
+                    pass
+            pending.append(i)
+
+        if len(pending) == 1:
+            prompt, schema = tasks[pending[0]]
+            results[pending[0]] = self.generate_json(prompt, schema, cache_seed)
+            return results
+
+        reply = None
+        if pending:
+            combined = _multi_task_schema(tuple(tasks[i][1] for i in pending))
+            batch_prompt = (
+                f"The following {len(pending)} tasks (TASK 1..TASK {len(pending)}) are independent "
+                f"requests. Answer each one and return a single JSON object with keys task1..task{len(pending)}, "
+                "where taskN holds the answer to TASK N.\n\n"
+                + "\n\n".join(f"=== TASK {n} ===\n{tasks[i][0]}" for n, i in enumerate(pending, 1))
+            )
+            try:
+                response = self.client.generate_content(
+                    batch_prompt,
+                    generation_config=_json_config(combined, 0.1),
+                )
+                if response.text:
+                    reply = combined.model_validate_json(response.text)
+                    self._safe_log(batch_prompt, response.text, "")
+            except Exception as e:
+                print(f"[LLM] Multi-task batch error (falling back to per-task calls): {e}")
+                self._safe_log(batch_prompt, "", str(e))
+                reply = None
+
+        if reply is not None:
+            for n, i in enumerate(pending, 1):
+                results[i] = getattr(reply, f"task{n}")
+                self.cache.set(keys[i], results[i].model_dump_json())
+        elif pending:
+            # Per-task fallback, at most max_concurrent requests in flight
+            with ThreadPoolExecutor(max_workers=max(1, min(self.max_concurrent, len(pending)))) as pool:
+                fallback = pool.map(lambda i: self.generate_json(tasks[i][0], tasks[i][1], cache_seed), pending)
+                for i, result in zip(pending, fallback):
+                    results[i] = result
+        return results
+
+    def _parse_json_response(self, prompt: str, text: str, schema: Type[T], cache_key: str) -> Optional[T]:
+        """Validate a JSON response against the schema, logging and caching it; None if unusable."""
+        try:
+            result = schema.model_validate_json(text)
+            self._safe_log(prompt, text, "")
+            self.cache.set(cache_key, text)
+            return result
+        except Exception as parse_error:
+            # Decoding is constrained to the schema (see _json_config), so a reply that
+            # still fails validation has nothing salvageable in it: use the fallback.
+            print(f"JSON parse error: {parse_error}")
+            self._safe_log(prompt, text, str(parse_error))
+        return None
+
     async def generate_ocr_text(self, file_path: str) -> Optional[str]:
         """Use Gemini Vision to extract text from an image or PDF (OCR)"""
-        if not self.is_configured:
+        if not self.is_configured or Part is None:
             return None
             
         try:
-            import google.genai as genai
-            from google.genai.types import Part
-            
-            # Read file data
-            with open(file_path, "rb") as f:
-                data = f.read()
+            # Read file data without blocking the event loop
+            async with aiofiles.open(file_path, "rb") as f:
+                data = await f.read()
             
             mime_type = "application/pdf" if file_path.lower().endswith(".pdf") else "image/png"
             
             prompt = "Extract all text from this document accurately. Maintain the structure where possible."
             
-            response = self.client.models.generate_content(
-                model="gemini-2.0-flash",
-                contents=[
-                    Part.from_bytes(data=data, mime_type=mime_type),
-                    prompt
-                ]
-            )
+            contents = [
+                Part.from_bytes(data=data, mime_type=mime_type),
+                prompt
+            ]
+            if hasattr(self.client, "aio"):
+                response = await self.client.aio.models.generate_content(
+                    model="gemini-2.0-flash",
+                    contents=contents,
+                )
+            else:
+                response = await asyncio.to_thread(
+                    self.client.models.generate_content,
+                    model="gemini-2.0-flash",
+                    contents=contents,
+                )
             
             if response.text:
                 self._safe_log(f"OCR: {file_path}", response.text, "")
@@ -167,14 +451,21 @@ class LLMService:
         """Generate plain text response"""
         
         if self.is_configured:
+            cacheable = temperature <= CACHEABLE_MAX_TEMPERATURE
+            if cacheable:
+                cache_key = self.cache.make_key(self.model_name, prompt, "", temperature)
+                cached = self.cache.get(cache_key)
+                if cached is not None:
+                    return cached
             try:
-                from google.genai.types import GenerateContentConfig
                 response = self.client.generate_content(
                     prompt,
-                    generation_config=GenerateContentConfig(temperature=temperature)
+                    generation_config=_text_config(temperature)
                 )
                 if response.text:
                     self._safe_log(prompt, response.text, "")
+                    if cacheable:
+                        self.cache.set(cache_key, response.text)
                     return response.text
             except Exception as e:
                 print(f"[LLM] Text generation error: {e}")
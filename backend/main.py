@@ -1,11 +1,13 @@
+import asyncio
 import uuid
 import json
 import os
 import re
+import shutil
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Dict, Optional
 
-import aiofiles
 from fastapi import FastAPI, HTTPException, UploadFile, File, Form
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
@@ -14,7 +16,8 @@ from orchestrator.types import ITRRunResult, TaxpayerProfile, TaxRegime, IncomeC
 from orchestrator.graph import run_itr_workflow, resume_itr_workflow
 from document_parser import extract_text_from_file
 from pydantic import BaseModel
-from db import init_db, save_run, load_run, load_all_runs
+from db import init_db, save_run, load_run_json, load_runs_summary
+from llm import llm_service
 
 # ─── App setup ───────────────────────────────────────────────────────────────
 
@@ -35,10 +38,18 @@ app.add_middleware(
 # Initialize DB on startup
 @app.on_event("startup")
 def startup_event():
-    init_db()
+    init_db(llm_cache_ttl=llm_service.cache.ttl)
+    UPLOAD_DIR.mkdir(exist_ok=True)
 
 UPLOAD_DIR = Path("uploads")
-UPLOAD_DIR.mkdir(exist_ok=True)
+EXTRACT_MAX_WORKERS = 8  # documents extracted in parallel per upload
+UPLOAD_CHUNK_SIZE = 1 << 20  # 1 MiB; uploads are streamed to disk, never held whole in memory
+
+
+def _copy_upload(src, dst_path: Path):
+    """Copy an UploadFile's spooled file to disk (blocking; run it off the event loop)."""
+    with open(dst_path, "wb") as dst:
+        shutil.copyfileobj(src, dst, UPLOAD_CHUNK_SIZE)
 
 
 # ─── Health ───────────────────────────────────────────────────────────────────
@@ -60,8 +71,7 @@ async def debug_extract_text(
     
     # Save temporarily
     with tempfile.NamedTemporaryFile(delete=False, suffix=Path(file.filename).suffix) as tmp:
-        content = await file.read()
-        tmp.write(content)
+        await asyncio.to_thread(shutil.copyfileobj, file.file, tmp, UPLOAD_CHUNK_SIZE)
         tmp_path = tmp.name
     
     try:
@@ -107,21 +117,29 @@ async def upload_and_run(
     """
     run_id = str(uuid.uuid4())
     run_upload_dir = UPLOAD_DIR / run_id
-    run_upload_dir.mkdir(parents=True, exist_ok=True)
-    
-    docs_raw = []
+    await asyncio.to_thread(run_upload_dir.mkdir, parents=True, exist_ok=True)
     
+    saved = []
     for file in files:
         # Save file
         file_path = run_upload_dir / file.filename
-        async with aiofiles.open(file_path, "wb") as f:
-            content = await file.read()
-            await f.write(content)
-        
-        # Extract text
-        try:
-            raw_text = extract_text_from_file(str(file_path), file.content_type)
-        except Exception as e:
+        await asyncio.to_thread(_copy_upload, file.file, file_path)
+        saved.append((file, file_path))
+    
+    # Extract text from all documents concurrently; they are independent
+    loop = asyncio.get_running_loop()
+    with ThreadPoolExecutor(max_workers=min(EXTRACT_MAX_WORKERS, len(saved)) or 1) as pool:
+        raw_texts = await asyncio.gather(
+            *(loop.run_in_executor(pool, extract_text_from_file, str(file_path), file.content_type)
+              for file, file_path in saved),
+            return_exceptions=True,
+        )
+    
+    docs_raw = []
+    
+    for (file, _), raw_text in zip(saved, raw_texts):
+        if isinstance(raw_text, BaseException):
+            e = raw_text
             from document_parser import OCRDependencyError
             # Fail explicitly if extraction fails - don't silently use hardcoded mock data
             if isinstance(e, OCRDependencyError):
@@ -151,12 +169,14 @@ async def upload_and_run(
     )
     
     try:
-        result = run_itr_workflow(docs_raw=docs_raw)
+        # The workflow blocks on its LLM batches; run it off the event loop so other
+        # requests are served meanwhile
+        result = await asyncio.to_thread(run_itr_workflow, docs_raw=docs_raw)
         result.run_id = run_id
         result.taxpayer = taxpayer
         # Ensure JSON-serializable for DB and response
         run_dict = result.model_dump(mode="json")
-        save_run(result.run_id, result.created_at, run_dict)
+        await asyncio.to_thread(save_run, result.run_id, result.created_at, run_dict)
         return result
     except Exception as e:
         import traceback
@@ -167,28 +187,9 @@ async def upload_and_run(
 # ─── List all runs ────────────────────────────────────────────────────────────
 
 @app.get("/itr/runs")
-def list_runs():
+def list_runs(limit: Optional[int] = None, offset: int = 0):
     """List all past ITR filing runs (most recent first)."""
-    runs_list = []
-    for run_dict in load_all_runs():
-        # Quick fallback mapping if parsing fails
-        try:
-            r = ITRRunResult(**run_dict)
-            runs_list.append({
-                "run_id": r.run_id,
-                "created_at": r.created_at,
-                "taxpayer_name": r.taxpayer.name,
-                "pan": r.taxpayer.pan,
-                "financial_year": r.taxpayer.financial_year,
-                "status": r.filing_status.status.value,
-                "net_refund": r.tax_computation.net_refund,
-                "net_payable": r.tax_computation.net_payable,
-                "total_income": r.aggregated_income.gross_total_income,
-            })
-        except Exception as e:
-            print(f"Error parsing run from DB: {e}")
-            
-    return runs_list
+    return load_runs_summary(limit=limit, offset=offset)
 
 
 # ─── Get single run ───────────────────────────────────────────────────────────
@@ -196,10 +197,10 @@ def list_runs():
 @app.get("/itr/runs/{run_id}", response_model=ITRRunResult)
 def get_run(run_id: str):
     """Get the full result for a specific ITR run."""
-    run_dict = load_run(run_id)
-    if not run_dict:
+    run_json = load_run_json(run_id)
+    if not run_json:
         raise HTTPException(status_code=404, detail=f"Run {run_id} not found")
-    return ITRRunResult(**run_dict)
+    return ITRRunResult.model_validate_json(run_json)
 
 
 # ─── Resume run ───────────────────────────────────────────────────────────────
@@ -210,11 +211,11 @@ class ResumeInput(BaseModel):
 
 @app.post("/itr/runs/{run_id}/resume", response_model=ITRRunResult)
 def resume_run(run_id: str, payload: ResumeInput):
-    run_dict = load_run(run_id)
-    if not run_dict:
+    run_json = load_run_json(run_id)
+    if not run_json:
         raise HTTPException(status_code=404, detail=f"Run {run_id} not found")
         
-    old_run = ITRRunResult(**run_dict)
+    old_run = ITRRunResult.model_validate_json(run_json)
     
     if old_run.filing_status.status != "NEEDS_REVIEW":
         raise HTTPException(status_code=400, detail="Only runs in NEEDS_REVIEW status can be resumed.")
@@ -231,11 +232,11 @@ def resume_run(run_id: str, payload: ResumeInput):
 @app.get("/itr/runs/{run_id}/steps")
 def get_run_steps(run_id: str):
     """Get the agent timeline steps for a specific run."""
-    run_dict = load_run(run_id)
-    if not run_dict:
+    run_json = load_run_json(run_id)
+    if not run_json:
         raise HTTPException(status_code=404, detail=f"Run {run_id} not found")
     
-    r = ITRRunResult(**run_dict)
+    r = ITRRunResult.model_validate_json(run_json)
     return {"run_id": run_id, "steps": r.agent_steps}
 
 
@@ -1,7 +1,16 @@
+import os
 import re
+import math
+import functools
+import hashlib
+import json
+import time
+import threading
+from collections import Counter, OrderedDict
 from typing import Dict, Any, Optional
 from pydantic import BaseModel, Field
 from llm import llm_service
+from db import load_llm_responses, save_llm_response
 
 class TaxExtraction(BaseModel):
     salary: float = Field(default=0.0, description="Total gross salary extracted from text")
@@ -13,20 +22,52 @@ class TaxExtraction(BaseModel):
     hra_exemption: float = Field(default=0.0, description="House Rent Allowance exemption")
     regime: str = Field(default="OLD", description="Choice of tax regime. Must be either 'OLD' or 'NEW'")
 
+_LAKH_RE = re.compile(r"([\d\.]+)\s*(?:l|lakh|lakhs)")
+_K_RE = re.compile(r"([\d\.]+)\s*k\b")
+_NUM_RE = re.compile(r"([\d]+(?:\.\d+)?)")
+
+# Amount following a field keyword, e.g. "salary is 8.5 lakh", "80c: 150000"
+_AMOUNT = r"((?:\d+(?:\.\d+)?)\s*(?:lakh|l|k)?\b)"
+_AMOUNT_NB = r"((?:\d+(?:\.\d+)?)\s*(?:lakh|l|k)?)"
+_SAL_RE = re.compile(r"(?:salary|earn|earned|package|income).*?(?:is|of|rs|₹)?\s*" + _AMOUNT)
+_INT_RE = re.compile(r"(?:interest|fd|fixed deposit|savings).*?(?:is|of|rs|₹)?\s*" + _AMOUNT)
+_TDS_SAL_RE = re.compile(r"(?:employer tds|tds salary|deducted tds|tds).*?(?:is|of|rs|₹)?\s*" + _AMOUNT)
+_TDS_BANK_RE = re.compile(r"(?:bank tds|tds bank|sbi deducted).*?(?:is|of|rs|₹)?\s*" + _AMOUNT)
+_80C_RE = re.compile(r"(?:80\s*c|80c|ppf|elss|lic|deduction|investment).*?(?:is|of|rs|₹|:|invested)?\s*" + _AMOUNT_NB)
+_80D_RE = re.compile(r"(?:80\s*d|80d|health|medical|insurance|premium).*?(?:is|of|rs|₹|:|paid)?\s*" + _AMOUNT_NB)
+_HRA_RE = re.compile(r"(?:hra|rent).*?(?:is|of|rs|₹)?\s*" + _AMOUNT)
+_FIELD_RES = (
+    ("salary", _SAL_RE),
+    ("interest_income", _INT_RE),
+    ("tds_salary", _TDS_SAL_RE),
+    ("tds_bank", _TDS_BANK_RE),
+    ("section_80c", _80C_RE),
+    ("section_80d", _80D_RE),
+    ("hra_exemption", _HRA_RE),
+)
+# Every field keyword in one alternation: a single scan finds where the first one is,
+# or that there is none and no field pattern can match
+_ANY_FIELD_RE = re.compile(
+    r"salary|earn|package|income|interest|fd|fixed deposit|savings|employer tds|deducted tds|tds"
+    r"|bank tds|sbi deducted|80\s*c|ppf|elss|lic|deduction|investment|80\s*d|health|medical"
+    r"|insurance|premium|hra|rent"
+)
+
+@functools.lru_cache(maxsize=1024)
 def extract_number_from_text(text: str) -> float:
     # Handle "8.5L", "2 Lakh", "1.5Lakh"
     text = text.lower().replace(",", "")
-    if "l" in text or "lakh" in text:
-        match = re.search(r"([\d\.]+)\s*(?:l|lakh|lakhs)", text)
+    if "l" in text:
+        match = _LAKH_RE.search(text)
         if match:
             return float(match.group(1)) * 100000
     if "k" in text:
-        match = re.search(r"([\d\.]+)\s*k\b", text)
+        match = _K_RE.search(text)
         if match:
             return float(match.group(1)) * 1000
     
     # Standard numbers
-    match = re.search(r"([\d]+(?:\.\d+)?)", text)
+    match = _NUM_RE.search(text)
     if match:
         return float(match.group(1))
     return 0.0
@@ -53,49 +94,147 @@ def _fallback_parse_magic_prompt(prompt: str) -> Dict[str, Any]:
     if "new regime" in p:
         data["regime"] = "NEW"
         
-    # Salary
-    sal_match = re.search(r"(?:salary|earn|earned|package|income).*?(?:is|of|rs|₹)?\s*((?:\d+(?:\.\d+)?)\s*(?:lakh|l|k)?\b)", p)
-    if sal_match:
-        data["salary"] = extract_number_from_text(sal_match.group(1))
-        
-    # Interest
-    int_match = re.search(r"(?:interest|fd|fixed deposit|savings).*?(?:is|of|rs|₹)?\s*((?:\d+(?:\.\d+)?)\s*(?:lakh|l|k)?\b)", p)
-    if int_match:
-        data["interest_income"] = extract_number_from_text(int_match.group(1))
-        
-    # TDS Salary
-    tds_sal = re.search(r"(?:employer tds|tds salary|deducted tds|tds).*?(?:is|of|rs|₹)?\s*((?:\d+(?:\.\d+)?)\s*(?:lakh|l|k)?\b)", p)
-    if tds_sal:
-        data["tds_salary"] = extract_number_from_text(tds_sal.group(1))
-        
-    # TDS Bank
-    tds_bank = re.search(r"(?:bank tds|tds bank|sbi deducted).*?(?:is|of|rs|₹)?\s*((?:\d+(?:\.\d+)?)\s*(?:lakh|l|k)?\b)", p)
-    if tds_bank:
-        data["tds_bank"] = extract_number_from_text(tds_bank.group(1))
-        
-    # 80C - multiple patterns for robustness
-    c80_match = re.search(r"(?:80\s*c|80c|ppf|elss|lic|deduction|investment).*?(?:is|of|rs|₹|:|invested)?\s*((?:\d+(?:\.\d+)?)\s*(?:lakh|l|k)?)", p)
-    if c80_match:
-        data["section_80c"] = extract_number_from_text(c80_match.group(1))
-        
-    # 80D - health/medical insurance
-    d80_match = re.search(r"(?:80\s*d|80d|health|medical|insurance|premium).*?(?:is|of|rs|₹|:|paid)?\s*((?:\d+(?:\.\d+)?)\s*(?:lakh|l|k)?)", p)
-    if d80_match:
-        data["section_80d"] = extract_number_from_text(d80_match.group(1))
-        
-    # HRA
-    hra_match = re.search(r"(?:hra|rent).*?(?:is|of|rs|₹)?\s*((?:\d+(?:\.\d+)?)\s*(?:lakh|l|k)?\b)", p)
-    if hra_match:
-        data["hra_exemption"] = extract_number_from_text(hra_match.group(1))
+    # Field amounts; each search starts at the first keyword of any field
+    first = _ANY_FIELD_RE.search(p)
+    if first is None:
+        return data
+    start = first.start()
+    for field, pattern in _FIELD_RES:
+        match = pattern.search(p, start)
+        if match:
+            data[field] = extract_number_from_text(match.group(1))
     return data
 
 
-def parse_magic_prompt(prompt: str) -> Dict[str, Any]:
+_WORD_RE = re.compile(r"[a-z]+")
+# Field keywords and amounts, in order of appearance; two prompts can share a cached
+# extraction only if this sequence is identical.
+_FACT_RE = re.compile(
+    r"new regime|old regime|salary|earn|package|income|interest|fd|fixed deposit|savings"
+    r"|tds|bank|employer|80\s*c|ppf|elss|lic|80\s*d|health|medical|insurance|hra|rent"
+    r"|\d+(?:\.\d+)?\s*(?:lakhs?|lakh|l|k|cr|crores?)?\b"
+)
+
+
+class PromptCache:
     """
-    Uses Gemini LLM to parse a natural language prompt into structured tax data.
-    Falls back to regex heuristics if the LLM is unavailable or fails.
+    Near-duplicate cache for parse_magic_prompt results.
+    Prompts are compared as bag-of-words vectors (cosine similarity), but only against
+    prompts stating the same facts: the same field keywords and amounts in the same order.
+    A rephrased prompt hits; a different salary or a swapped field never does.
+    With persist=True, entries are written through to the llm_cache table (under the
+    "prompt:" key prefix) and the newest ones fresher than ttl are reloaded on first use.
     """
-    system_prompt = f"""
+
+    KEY_PREFIX = "prompt:"
+
+    def __init__(self, threshold: float = 0.92, max_entries: int = 256, persist: bool = False, ttl: float = 0):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.persist = persist
+        self.ttl = ttl
+        self._buckets: "OrderedDict[tuple, list]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self._loaded = not persist
+
+    @staticmethod
+    def _embed(prompt: str):
+        p = prompt.lower().replace(",", "")
+        facts = tuple(f.replace(" ", "") for f in _FACT_RE.findall(p))
+        vector = Counter(_WORD_RE.findall(p))
+        norm = math.sqrt(sum(v * v for v in vector.values())) or 1.0
+        return facts, vector, norm
+
+    def _load(self):
+        """Fill the cache from llm_cache once; a failed read leaves it empty."""
+        self._loaded = True
+        if self.max_entries <= 0:
+            return
+        fresh_since = time.time() - self.ttl if self.ttl > 0 else 0.0
+        try:
+            rows = load_llm_responses(self.KEY_PREFIX, fresh_since, self.max_entries)
+        except Exception as e:
+            print(f"Failed to read prompt cache: {e}")
+            return
+        for row in rows:
+            entry = json.loads(row)
+            self._remember(entry["prompt"], entry["data"])
+
+    def _remember(self, prompt: str, data: Dict[str, Any]):
+        facts, vector, norm = self._embed(prompt)
+        with self._lock:
+            self._buckets.setdefault(facts, []).append((vector, norm, dict(data)))
+            self._buckets.move_to_end(facts)
+            self._size += 1
+            while self._size > self.max_entries:
+                _, evicted = self._buckets.popitem(last=False)
+                self._size -= len(evicted)
+
+    def get(self, prompt: str) -> Optional[Dict[str, Any]]:
+        if not self._loaded:
+            self._load()
+        facts, vector, norm = self._embed(prompt)
+        with self._lock:
+            for cached_vector, cached_norm, data in self._buckets.get(facts, ()):
+                dot = sum(count * cached_vector[word] for word, count in vector.items())
+                if dot / (norm * cached_norm) >= self.threshold:
+                    self._buckets.move_to_end(facts)
+                    return dict(data)
+        return None
+
+    def add(self, prompt: str, data: Dict[str, Any]):
+        if self.max_entries <= 0:
+            return
+        if not self._loaded:
+            self._load()
+        self._remember(prompt, data)
+        if not self.persist:
+            return
+        key = self.KEY_PREFIX + hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+        try:
+            save_llm_response(key, json.dumps({"prompt": prompt, "data": data}))
+        except Exception as e:
+            print(f"Failed to write prompt cache: {e}")
+
+
+prompt_cache = PromptCache(
+    threshold=float(os.getenv("PROMPT_CACHE_THRESHOLD", "0.92")),
+    max_entries=int(os.getenv("PROMPT_CACHE_SIZE", "256")),
+    persist=llm_service.cache.persist,
+    ttl=llm_service.cache.ttl,
+)
+
+
+_KEY_FIELDS = (
+    "salary",
+    "interest_income",
+    "tds_salary",
+    "tds_bank",
+    "section_80c",
+    "section_80d",
+    "hra_exemption",
+)
+
+
+# REGEX_FIRST=true: answer from the regex parser when it already finds at least
+# REGEX_FIRST_MIN_FIELDS non-zero fields, and only call the LLM otherwise.
+REGEX_FIRST = os.getenv("REGEX_FIRST", "false").lower() == "true"
+REGEX_FIRST_MIN_FIELDS = 2
+
+
+def _regex_first(prompt: str) -> Optional[Dict[str, Any]]:
+    if not REGEX_FIRST:
+        return None
+    data = _fallback_parse_magic_prompt(prompt)
+    if sum(1 for k in _KEY_FIELDS if data[k] > 0) >= REGEX_FIRST_MIN_FIELDS:
+        print("[REGEX FIRST] prompt fully parsed by regex; skipping LLM.")
+        return data
+    return None
+
+
+def _magic_system_prompt(prompt: str) -> str:
+    return f"""
     You are an expert Indian tax assistant. Read the following user prompt which 
     describes their tax situation, income, and deductions in free-form text.
     Extract the exact numerical values into the requested JSON schema.
@@ -104,29 +243,43 @@ def parse_magic_prompt(prompt: str) -> Dict[str, Any]:
     
     User Prompt: "{prompt}"
     """
+
+
+def _accept_llm_extraction(prompt: str, extracted: Optional[TaxExtraction]) -> Optional[Dict[str, Any]]:
+    """Return the LLM extraction if it carries at least one non-zero key field, else None."""
+    if not extracted:
+        return None
+    if any(getattr(extracted, k) > 0 for k in _KEY_FIELDS):
+        print("[LLM SUCCESS] extracted prompt data via Gemini.")
+        data = extracted.model_dump()
+        prompt_cache.add(prompt, data)
+        return data
+    # All zeros → treat as failure and fall back to regex heuristics.
+    print("[LLM ZERO OUTPUT] using regex fallback for prompt parsing.")
+    return None
+
+
+def parse_magic_prompt(prompt: str) -> Dict[str, Any]:
+    """
+    Uses Gemini LLM to parse a natural language prompt into structured tax data.
+    Falls back to regex heuristics if the LLM is unavailable or fails.
+    """
+    cached = prompt_cache.get(prompt)
+    if cached is not None:
+        print("[PROMPT CACHE HIT] reusing extraction for a near-identical prompt.")
+        return cached
+    data = _regex_first(prompt)
+    if data is not None:
+        return data
     
     try:
-        extracted = llm_service.generate_json(system_prompt, TaxExtraction)
-        if extracted:
-            data = extracted.model_dump()
-            # If LLM returned at least one non‑zero key field, trust it.
-            key_fields = [
-                "salary",
-                "interest_income",
-                "tds_salary",
-                "tds_bank",
-                "section_80c",
-                "section_80d",
-                "hra_exemption",
-            ]
-            has_signal = any(float(data.get(k, 0) or 0) > 0 for k in key_fields)
-            if has_signal:
-                print("[LLM SUCCESS] extracted prompt data via Gemini.")
-                return data
-            # All zeros → treat as failure and fall back to regex heuristics.
-            print("[LLM ZERO OUTPUT] using regex fallback for prompt parsing.")
+        extracted = llm_service.generate_json(_magic_system_prompt(prompt), TaxExtraction)
+        data = _accept_llm_extraction(prompt, extracted)
+        if data is not None:
+            return data
     except Exception as e:
         print(f"[LLM ERROR] falling back to regex parsing: {e}")
     
     print("[LLM FALLBACK] falling back to regex for prompt parsing.")
     return _fallback_parse_magic_prompt(prompt)
+
@@ -6,7 +6,7 @@ try:
     doc = fitz.open(pdf_path)
     print("pages", len(doc))
     page = doc[0]
-    pix = page.get_pixmap(dpi=300)
+    pix = page.get_pixmap(dpi=150, colorspace=fitz.csGRAY, alpha=False)
     out = r"c:\Users\HP\Desktop\ksum\backend\page0.png"
     pix.save(out)
     print("saved page image to", out)
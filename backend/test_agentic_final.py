@@ -138,6 +138,59 @@ def test_high_earner():
     print(f"🎯 {len(result.agent_steps)} Intelligent Agents Completed")
     return result.filing_status.status == FilingStatusEnum.E_VERIFIED
 
+def test_slab_boundaries():
+    """Test Case 4: tax at and just past the slab edges, for taxable income given exactly"""
+    from orchestrator.types import AggregatedIncome, DeductionSummary
+    from orchestrator.graph import _compute_tax
+
+    def total_tax(regime, taxable):
+        # Old regime taxes gross minus the claimed deductions (none here); new regime
+        # subtracts its own ₹75,000 standard deduction
+        gross = taxable if regime == TaxRegime.OLD else taxable + 75000
+        tc = _compute_tax(AggregatedIncome(gross_total_income=gross), DeductionSummary(),
+                          TaxpayerProfile(regime=regime))
+        assert tc.taxable_income == taxable
+        return round(tc.total_tax_liability, 2)
+
+    # Old regime: 0% to 2.5L, 5% to 5L, 20% to 10L, 30% above; 87A rebate up to 5L; 4% cess
+    assert total_tax(TaxRegime.OLD, 250000) == 0
+    assert total_tax(TaxRegime.OLD, 500000) == 0                   # 12,500 fully rebated
+    assert total_tax(TaxRegime.OLD, 500001) == round(12500.2 * 1.04, 2)
+    assert total_tax(TaxRegime.OLD, 610000) == 35880               # (12,500 + 22,000) + cess
+    assert total_tax(TaxRegime.OLD, 1000000) == 117000             # (12,500 + 1,00,000) + cess
+    assert total_tax(TaxRegime.OLD, 1000100) == round(112530 * 1.04, 2)
+
+    # New regime: 3L/6L/9L/12L/15L edges at 0/5/10/15/20/30%; 87A rebate up to 7L
+    assert total_tax(TaxRegime.NEW, 300000) == 0
+    assert total_tax(TaxRegime.NEW, 700000) == 0                   # 25,000 fully rebated
+    assert total_tax(TaxRegime.NEW, 900000) == 46800               # (15,000 + 30,000) + cess
+    assert total_tax(TaxRegime.NEW, 1500000) == 156000             # 1,50,000 + cess
+
+def test_rule_gates():
+    """Test Case 5: the rule checks that decide whether an agent needs the LLM at all"""
+    from orchestrator.types import IncomeComponents, AggregatedIncome, ITRFormData
+    from orchestrator.graph import _income_is_routine, _routine_scenario, _form_issues
+
+    # Income: TDS up to 30% of salary and interest up to ₹50 lakh are routine
+    assert _income_is_routine(IncomeComponents(gross_salary=1000000, tds_salary=300000, interest_income=50000))
+    assert not _income_is_routine(IncomeComponents(gross_salary=1000000, tds_salary=300001))
+    assert not _income_is_routine(IncomeComponents(gross_salary=1000000, interest_income=5000001))
+    assert not _income_is_routine(IncomeComponents(gross_salary=1000000, tds_salary=-1))
+
+    # Scenario: seniors first, then gross income above ₹50 lakh; other income goes to the LLM
+    assert _routine_scenario(AggregatedIncome(gross_total_income=900000), TaxpayerProfile(age=60)) == ("SENIOR_CITIZEN", "LOW")
+    assert _routine_scenario(AggregatedIncome(gross_total_income=5000001), TaxpayerProfile(age=40)) == ("HIGH_EARNER", "MEDIUM")
+    assert _routine_scenario(AggregatedIncome(gross_total_income=5000000), TaxpayerProfile(age=40)) == ("SALARIED_BASIC", "LOW")
+    assert _routine_scenario(AggregatedIncome(total_other=1), TaxpayerProfile(age=40)) is None
+
+    # Form: blank name/PAN and negative amounts are issues; a filled form has none
+    form = ITRFormData()
+    assert _form_issues(form) == ["Name", "PAN"]
+    form.part_a.name, form.part_a.pan = "Test User", "ABCDE1234F"
+    assert _form_issues(form) == []
+    form.tax_computation.total_tax = -1
+    assert _form_issues(form) == ["Total tax is negative"]
+
 def main():
     """Run all tests and print summary"""
     print("\n" + "X"*80)
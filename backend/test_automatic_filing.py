@@ -220,6 +220,57 @@ def test_ocr_dependency_error():
             return False
 
 
+def test_tds_not_read_from_act_year():
+    """The "Income-tax Act, 1961" header on every Form 16 must not be taken as the TDS amount."""
+    from document_parser import _generate_mock_text
+    from orchestrator.graph import _extract_tds_from_form16
+
+    header_only = """
+    FORM NO. 16 - Certificate under Section 203 of the Income-tax Act, 1961
+    Employer: TechCorp India Pvt Ltd (TAN: MUMB12345A)
+    Period: 01-Apr-2024 to 31-Mar-2025 (AY 2025-26)
+    Gross Salary: Rs. 8,50,000
+    """
+    assert _extract_tds_from_form16(header_only) == 0.0
+    assert _extract_tds_from_form16(_generate_mock_text("form16.pdf")) != 1961.0
+
+
+def test_runs_summary_columns_backfilled():
+    """A runs table from before the summary columns gets them added and filled from data_json."""
+    import json
+    import sqlite3
+    import tempfile
+    import db
+
+    run = {
+        "taxpayer": {"name": "Rahul Sharma", "pan": "ABCRS1234H", "financial_year": "2024-25"},
+        "filing_status": {"status": "E_VERIFIED"},
+        "tax_computation": {"net_refund": 1200.0, "net_payable": 0.0},
+        "aggregated_income": {"gross_total_income": 1050000.0},
+    }
+    db._close()
+    original_db_file = db.DB_FILE
+    with tempfile.TemporaryDirectory() as tmpdir:
+        db.DB_FILE = Path(tmpdir) / "legacy.db"
+        conn = sqlite3.connect(db.DB_FILE)
+        conn.execute("CREATE TABLE runs (run_id TEXT PRIMARY KEY, created_at TEXT, data_json TEXT)")
+        conn.execute("INSERT INTO runs VALUES (?, ?, ?)", ("r1", "2025-01-01T00:00:00Z", json.dumps(run)))
+        conn.commit()
+        conn.close()
+        try:
+            db.init_db()
+            rows = db.load_runs_summary()
+        finally:
+            db._close()
+            db.DB_FILE = original_db_file
+
+    assert rows == [{
+        "run_id": "r1", "created_at": "2025-01-01T00:00:00Z",
+        "taxpayer_name": "Rahul Sharma", "pan": "ABCRS1234H", "financial_year": "2024-25",
+        "status": "E_VERIFIED", "net_refund": 1200.0, "net_payable": 0.0, "total_income": 1050000.0,
+    }]
+
+
 def run_all_tests():
     """Run complete test suite"""
     print("\n" + "="*80)